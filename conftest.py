@@ -1,6 +1,4 @@
 # -*- coding: utf-8 -*-
-from __future__ import with_statement
-
 from trueskill.backends import available_backends
 
 
@@ -31,15 +29,17 @@ def various_backends(backends=None):
     if hasattr(backends, '__call__'):
         return various_backends(True)(backends)
     def decorator(f):
+        # inspect the signature once, not for every parametrized call.
+        try:
+            sig = inspect.signature(f)
+        except AttributeError:
+            spec = inspect.getargspec(f)
+            params = spec[0]
+        else:
+            params = sig.parameters
+        takes_backend = 'backend' in params
         def wrapped(backend, *args, **kwargs):
-            try:
-                sig = inspect.signature(f)
-            except AttributeError:
-                spec = inspect.getargspec(f)
-                params = spec[0]
-            else:
-                params = sig.parameters
-            if 'backend' in params:
+            if takes_backend:
                 kwargs.setdefault('backend', backend)
             with substituted_trueskill(backend=backend):
                 return f(*args, **kwargs)
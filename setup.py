@@ -42,8 +42,6 @@ See Also
   <http://atom.research.microsoft.com/trueskill/rankcalculator.aspx>`_
 
 """
-from __future__ import with_statement
-
 import os
 
 from setuptools import setup
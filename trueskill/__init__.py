@@ -186,6 +186,7 @@ class TrueSkill(object):
             self.cdf, self.pdf, self.ppf = backend
         else:
             self.cdf, self.pdf, self.ppf = choose_backend(backend)
+        self._draw_margins = {}
 
     def create_rating(self, mu=None, sigma=None):
         """Initializes new :class:`Rating` object, but it fixes default mu and
@@ -239,6 +240,19 @@ class TrueSkill(object):
         v = self.v_draw(abs_diff, draw_margin)
         return (v ** 2) + (a * self.pdf(a) - b * self.pdf(b)) / denom
 
+    def _calc_static_draw_margin(self, size):
+        """Calculates a draw-margin from the static draw probability.  The
+        result is memoized because it only depends on the environment and the
+        number of players in the two teams.
+        """
+        key = (self.draw_probability, self.beta, self.ppf, size)
+        try:
+            return self._draw_margins[key]
+        except KeyError:
+            draw_margin = calc_draw_margin(self.draw_probability, size, self)
+            self._draw_margins[key] = draw_margin
+            return draw_margin
+
     def validate_rating_groups(self, rating_groups):
         """Validates a ``rating_groups`` argument.  It should contain more than
         2 groups and all groups must not be empty.
@@ -293,14 +307,10 @@ class TrueSkill(object):
         if weights is None:
             weights = [(1,) * len(g) for g in rating_groups]
         elif isinstance(weights, dict):
-            weights_dict, weights = weights, []
-            for x, group in enumerate(rating_groups):
-                w = []
-                weights.append(w)
-                for y, rating in enumerate(group):
-                    if keys is not None:
-                        y = keys[x][y]
-                    w.append(weights_dict.get((x, y), 1))
+            if keys is None:
+                keys = [range(len(group)) for group in rating_groups]
+            weights = [[weights.get((x, y), 1) for y in key_group]
+                       for x, key_group in enumerate(keys)]
         return weights
 
     def factor_graph_builders(self, rating_groups, ranks, weights):
@@ -356,16 +366,17 @@ class TrueSkill(object):
                                 team_perf_vars[team:team + 2], [+1, -1])
         def build_trunc_layer():
             for x, team_diff_var in enumerate(team_diff_vars):
+                size = sum(map(len, rating_groups[x:x + 2]))
                 if callable(self.draw_probability):
                     # dynamic draw probability
                     team_perf1, team_perf2 = team_perf_vars[x:x + 2]
                     args = (Rating(team_perf1), Rating(team_perf2), self)
                     draw_probability = self.draw_probability(*args)
+                    draw_margin = calc_draw_margin(draw_probability, size,
+                                                   self)
                 else:
                     # static draw probability
-                    draw_probability = self.draw_probability
-                size = sum(map(len, rating_groups[x:x + 2]))
-                draw_margin = calc_draw_margin(draw_probability, size, self)
+                    draw_margin = self._calc_static_draw_margin(size)
                 if ranks[x] == ranks[x + 1]:  # is a tie?
                     v_func, w_func = self.v_draw, self.w_draw
                 else:
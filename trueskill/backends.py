@@ -19,10 +19,15 @@ from six.moves import range
 __all__ = ['available_backends', 'choose_backend', 'cdf', 'pdf', 'ppf']
 
 
+_SQRT_2 = math.sqrt(2)
+_INV_SQRT_2PI = 1 / math.sqrt(2 * math.pi)
+
+
 def _gen_erfcinv(erfc, math=math):
     """Generates the inverse function of erfc by the given erfc function and
     math module.
     """
+    sqrt, log, exp = math.sqrt, math.log, math.exp
     def erfcinv(y):
         """The inverse function of erfc."""
         if y >= 2:
@@ -32,12 +37,12 @@ def _gen_erfcinv(erfc, math=math):
         zero_point = y < 1
         if not zero_point:
             y = 2 - y
-        t = math.sqrt(-2 * math.log(y / 2.))
+        t = sqrt(-2 * log(y / 2.))
         x = -0.70711 * \
             ((2.30753 + t * 0.27061) / (1. + t * (0.99229 + t * 0.04481)) - t)
         for i in range(2):
             err = erfc(x) - y
-            x += err / (1.12837916709551257 * math.exp(-(x ** 2)) - x * err)
+            x += err / (1.12837916709551257 * exp(-(x ** 2)) - x * err)
         return x if zero_point else -x
     return erfcinv
 
@@ -47,9 +52,10 @@ def _gen_ppf(erfc, math=math):
     given erfc and math module.
     """
     erfcinv = _gen_erfcinv(erfc, math)
+    sqrt_2 = math.sqrt(2)
     def ppf(x, mu=0, sigma=1):
         """The inverse function of cdf."""
-        return mu - sigma * math.sqrt(2) * erfcinv(2 * x)
+        return mu - sigma * sqrt_2 * erfcinv(2 * x)
     return ppf
 
 
@@ -69,18 +75,38 @@ def erfc(x):
 
 def cdf(x, mu=0, sigma=1):
     """Cumulative distribution function"""
-    return 0.5 * erfc(-(x - mu) / (sigma * math.sqrt(2)))
+    return 0.5 * erfc(-(x - mu) / (sigma * _SQRT_2))
 
 
 def pdf(x, mu=0, sigma=1):
     """Probability density function"""
-    return (1 / math.sqrt(2 * math.pi) * abs(sigma) *
+    return (_INV_SQRT_2PI / abs(sigma) *
             math.exp(-(((x - mu) / abs(sigma)) ** 2 / 2)))
 
 
 ppf = _gen_ppf(erfc)
 
 
+def _gen_scipy_functions(ndtr, ndtri):
+    """Generates cdf, pdf, ppf from the standard normal functions of
+    :mod:`scipy.special`.  They call the compiled functions directly instead
+    of going through the generic machinery of :data:`scipy.stats.norm`.
+    """
+    import numpy
+    exp = numpy.exp
+    def cdf(x, mu=0, sigma=1):
+        """Cumulative distribution function"""
+        return ndtr((x - mu) / sigma)
+    def pdf(x, mu=0, sigma=1):
+        """Probability density function"""
+        sigma = abs(sigma)
+        return _INV_SQRT_2PI / sigma * exp(-((x - mu) / sigma) ** 2 / 2.)
+    def ppf(x, mu=0, sigma=1):
+        """The inverse function of cdf."""
+        return mu + sigma * ndtri(x)
+    return cdf, pdf, ppf
+
+
 def choose_backend(backend):
     """Returns a tuple containing cdf, pdf, ppf from the chosen backend.
 
@@ -104,10 +130,10 @@ def choose_backend(backend):
         return mpmath.ncdf, mpmath.npdf, _gen_ppf(mpmath.erfc, math=mpmath)
     elif backend == 'scipy':
         try:
-            from scipy.stats import norm
+            from scipy.special import ndtr, ndtri
         except ImportError:
             raise ImportError('Install "scipy" to use this backend')
-        return norm.cdf, norm.pdf, norm.ppf
+        return _gen_scipy_functions(ndtr, ndtri)
     raise ValueError('%r backend is not defined' % backend)
 
 
@@ -11,7 +11,7 @@
 """
 from __future__ import absolute_import
 
-import warnings
+from warnings import warn
 
 from . import DELTA, expose, global_env, quality_1vs1, rate_1vs1, Rating
 
@@ -38,7 +38,7 @@ def dynamic_draw_probability(rating1, rating2, env=None):
        Use :func:`quality_1vs1` instead.
 
     """
-    warnings.warn('Use quality_1vs1() instead', DeprecationWarning)
+    warn('Use quality_1vs1() instead', DeprecationWarning)
     return quality_1vs1(rating1, rating2, env=env)
 
 
@@ -67,7 +67,7 @@ def TrueSkill_Rating(self, mu=None, sigma=None):
        Override :meth:`create_rating` instead.
 
     """
-    warnings.warn('Use TrueSkill.create_rating() instead', DeprecationWarning)
+    warn('Use TrueSkill.create_rating() instead', DeprecationWarning)
     return self.create_rating(mu, sigma)
 
 
@@ -79,7 +79,7 @@ def TrueSkill_transform_ratings(self, rating_groups, ranks=None,
        Override :meth:`rate` instead.
 
     """
-    warnings.warn('Use TrueSkill.rate() instead', DeprecationWarning)
+    warn('Use TrueSkill.rate() instead', DeprecationWarning)
     rating_groups = [(r,) if isinstance(r, Rating) else r
                      for r in rating_groups]
     return self.rate(rating_groups, ranks, min_delta=min_delta)
@@ -92,7 +92,7 @@ def TrueSkill_match_quality(self, rating_groups):
        Override :meth:`quality` instead.
 
     """
-    warnings.warn('Use TrueSkill.quality() instead', DeprecationWarning)
+    warn('Use TrueSkill.quality() instead', DeprecationWarning)
     rating_groups = [(r,) if isinstance(r, Rating) else r
                      for r in rating_groups]
     return self.quality(rating_groups)
@@ -105,8 +105,7 @@ def TrueSkill_rate_1vs1(self, rating1, rating2, drawn=False, min_delta=DELTA):
        Use :func:`rate_1vs1` instead.
 
     """
-    warnings.warn('Use global function rate_1vs1() instead',
-                  DeprecationWarning)
+    warn('Use global function rate_1vs1() instead', DeprecationWarning)
     return rate_1vs1(rating1, rating2, drawn, min_delta, self)
 
 
@@ -117,8 +116,7 @@ def TrueSkill_quality_1vs1(self, rating1, rating2):
        Use :func:`quality_1vs1` instead.
 
     """
-    warnings.warn('Use global function quality_1vs1() instead',
-                  DeprecationWarning)
+    warn('Use global function quality_1vs1() instead', DeprecationWarning)
     return quality_1vs1(rating1, rating2, self)
 
 
@@ -130,5 +128,5 @@ def Rating_exposure(self):
        Use :meth:`TrueSkill.expose` instead.
 
     """
-    warnings.warn('Use TrueSkill.expose() instead', DeprecationWarning)
+    warn('Use TrueSkill.expose() instead', DeprecationWarning)
     return expose(self)
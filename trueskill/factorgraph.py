@@ -13,7 +13,7 @@ from __future__ import absolute_import
 
 import math
 
-from six.moves import zip
+from six.moves import range
 
 from .mathematics import Gaussian, inf
 
@@ -24,11 +24,13 @@ __all__ = ['Variable', 'PriorFactor', 'LikelihoodFactor', 'SumFactor',
 
 class Node(object):
 
-    pass
+    __slots__ = ('__weakref__',)
 
 
 class Variable(Node, Gaussian):
 
+    __slots__ = ('messages',)
+
     def __init__(self):
         self.messages = {}
         super(Variable, self).__init__()
@@ -46,13 +48,19 @@ class Variable(Node, Gaussian):
 
     def update_message(self, factor, pi=0, tau=0, message=None):
         message = message or Gaussian(pi=pi, tau=tau)
-        old_message, self[factor] = self[factor], message
-        return self.set(self / old_message * message)
+        messages = self.messages
+        old_message, messages[factor] = messages[factor], message
+        # self / old_message * message without the intermediate Gaussian.
+        return self.set(Gaussian(pi=self.pi - old_message.pi + message.pi,
+                                 tau=self.tau - old_message.tau + message.tau))
 
     def update_value(self, factor, pi=0, tau=0, value=None):
         value = value or Gaussian(pi=pi, tau=tau)
-        old_message = self[factor]
-        self[factor] = value * old_message / self
+        messages = self.messages
+        old_message = messages[factor]
+        # value * old_message / self without the intermediate Gaussian.
+        messages[factor] = Gaussian(pi=value.pi + old_message.pi - self.pi,
+                                    tau=value.tau + old_message.tau - self.tau)
         return self.set(value)
 
     def __getitem__(self, factor):
@@ -69,10 +77,12 @@ class Variable(Node, Gaussian):
 
 class Factor(Node):
 
+    __slots__ = ('vars',)
+
     def __init__(self, variables):
         self.vars = variables
         for var in variables:
-            var[self] = Gaussian()
+            var.messages[self] = Gaussian()
 
     def down(self):
         return 0
@@ -93,55 +103,77 @@ class Factor(Node):
 
 class PriorFactor(Factor):
 
+    __slots__ = ('val', 'dynamic', '_pi', '_tau')
+
     def __init__(self, var, val, dynamic=0):
         super(PriorFactor, self).__init__([var])
         self.val = val
         self.dynamic = dynamic
+        # the value never changes so keep it in the precision form.
+        sigma = math.sqrt(val.sigma ** 2 + dynamic ** 2)
+        self._pi = sigma ** -2
+        self._tau = self._pi * val.mu
 
     def down(self):
-        sigma = math.sqrt(self.val.sigma ** 2 + self.dynamic ** 2)
-        value = Gaussian(self.val.mu, sigma)
-        return self.var.update_value(self, value=value)
+        return self.var.update_value(self, self._pi, self._tau)
 
 
 class LikelihoodFactor(Factor):
 
+    __slots__ = ('mean', 'value', 'variance')
+
     def __init__(self, mean_var, value_var, variance):
         super(LikelihoodFactor, self).__init__([mean_var, value_var])
         self.mean = mean_var
         self.value = value_var
         self.variance = variance
 
-    def calc_a(self, var):
-        return 1. / (1. + self.variance * var.pi)
+    def _send(self, src, dst):
+        # divide src by its message without making a Gaussian.
+        msg = src.messages[self]
+        pi, tau = src.pi - msg.pi, src.tau - msg.tau
+        a = 1. / (1. + self.variance * pi)
+        return dst.update_message(self, a * pi, a * tau)
 
     def down(self):
         # update value.
-        msg = self.mean / self.mean[self]
-        a = self.calc_a(msg)
-        return self.value.update_message(self, a * msg.pi, a * msg.tau)
+        return self._send(self.mean, self.value)
 
     def up(self):
         # update mean.
-        msg = self.value / self.value[self]
-        a = self.calc_a(msg)
-        return self.mean.update_message(self, a * msg.pi, a * msg.tau)
+        return self._send(self.value, self.mean)
 
 
 class SumFactor(Factor):
 
+    __slots__ = ('sum', 'terms', 'coeffs', '_coeffs_sq', '_up_coeffs')
+
     def __init__(self, sum_var, term_vars, coeffs):
         super(SumFactor, self).__init__([sum_var] + term_vars)
         self.sum = sum_var
         self.terms = term_vars
         self.coeffs = coeffs
+        self._coeffs_sq = [c * c for c in coeffs]
+        self._up_coeffs = {}
 
     def down(self):
         vals = self.terms
-        msgs = [var[self] for var in vals]
-        return self.update(self.sum, vals, msgs, self.coeffs)
+        msgs = [var.messages[self] for var in vals]
+        return self.update(self.sum, vals, msgs, self.coeffs, self._coeffs_sq)
 
     def up(self, index=0):
+        # the coefficients for each index never change.
+        try:
+            coeffs, coeffs_sq = self._up_coeffs[index]
+        except KeyError:
+            coeffs, coeffs_sq = self._up_coeffs[index] = \
+                self._calc_up_coeffs(index)
+        vals = self.terms[:]
+        vals[index] = self.sum
+        msgs = [var.messages[self] for var in vals]
+        return self.update(self.terms[index], vals, msgs, coeffs, coeffs_sq)
+
+    def _calc_up_coeffs(self, index):
         coeff = self.coeffs[index]
         coeffs = []
         for x, c in enumerate(self.coeffs):
@@ -152,34 +184,39 @@ class SumFactor(Factor):
                     coeffs.append(-c / coeff)
             except ZeroDivisionError:
                 coeffs.append(0.)
-        vals = self.terms[:]
-        vals[index] = self.sum
-        msgs = [var[self] for var in vals]
-        return self.update(self.terms[index], vals, msgs, coeffs)
+        return coeffs, [c * c for c in coeffs]
 
-    def update(self, var, vals, msgs, coeffs):
+    def update(self, var, vals, msgs, coeffs, coeffs_sq=None):
+        if coeffs_sq is None:
+            coeffs_sq = [c * c for c in coeffs]
         pi_inv = 0
         mu = 0
-        for val, msg, coeff in zip(vals, msgs, coeffs):
-            div = val / msg
-            mu += coeff * div.mu
-            if pi_inv == inf:
-                continue
-            try:
-                # numpy.float64 handles floating-point error by different way.
-                # For example, it can just warn RuntimeWarning on n/0 problem
-                # instead of throwing ZeroDivisionError.  So div.pi, the
-                # denominator has to be a built-in float.
-                pi_inv += coeff ** 2 / float(div.pi)
-            except ZeroDivisionError:
-                pi_inv = inf
-        pi = 1. / pi_inv
+        # an infinite variance of any term makes the sum infinite too.
+        infinite = False
+        _float = float
+        for x in range(len(coeffs)):
+            val, msg = vals[x], msgs[x]
+            # divide the value by the message without making a Gaussian.
+            div_pi, div_tau = val.pi - msg.pi, val.tau - msg.tau
+            mu += coeffs[x] * (div_tau / div_pi if div_pi else div_pi)
+            # numpy.float64 handles floating-point error by different way.
+            # For example, it can just warn RuntimeWarning on n/0 problem
+            # instead of throwing ZeroDivisionError.  So div_pi, the
+            # denominator has to be a built-in float.
+            div_pi = _float(div_pi)
+            if div_pi:
+                pi_inv += coeffs_sq[x] / div_pi
+            else:
+                infinite = True
+        pi = 0. if infinite else 1. / pi_inv
         tau = pi * mu
         return var.update_message(self, pi, tau)
 
 
 class TruncateFactor(Factor):
 
+    __slots__ = ('v_func', 'w_func', 'draw_margin')
+
     def __init__(self, var, v_func, w_func, draw_margin):
         super(TruncateFactor, self).__init__([var])
         self.v_func = v_func
@@ -188,12 +225,13 @@ class TruncateFactor(Factor):
 
     def up(self):
         val = self.var
-        msg = self.var[self]
-        div = val / msg
-        sqrt_pi = math.sqrt(div.pi)
-        args = (div.tau / sqrt_pi, self.draw_margin * sqrt_pi)
-        v = self.v_func(*args)
-        w = self.w_func(*args)
+        msg = val.messages[self]
+        # divide the value by the message without making a Gaussian.
+        div_pi, div_tau = val.pi - msg.pi, val.tau - msg.tau
+        sqrt_pi = math.sqrt(div_pi)
+        diff, draw_margin = div_tau / sqrt_pi, self.draw_margin * sqrt_pi
+        v = self.v_func(diff, draw_margin)
+        w = self.w_func(diff, draw_margin)
         denom = (1. - w)
-        pi, tau = div.pi / denom, (div.tau + sqrt_pi * v) / denom
+        pi, tau = div_pi / denom, (div_tau + sqrt_pi * v) / denom
         return val.update_value(self, pi, tau)
@@ -12,14 +12,13 @@
 """
 from __future__ import absolute_import
 
-import copy
 import math
 try:
     from numbers import Number
 except ImportError:
     Number = (int, long, float, complex)
 
-from six import iterkeys
+from six import iteritems, iterkeys
 
 
 __all__ = ['Gaussian', 'Matrix', 'inf']
@@ -31,10 +30,7 @@ inf = float('inf')
 class Gaussian(object):
     """A model for the normal distribution."""
 
-    #: Precision, the inverse of the variance.
-    pi = 0
-    #: Precision adjusted mean, the precision multiplied by the mean.
-    tau = 0
+    __slots__ = ('pi', 'tau')
 
     def __init__(self, mu=None, sigma=None, pi=0, tau=0):
         if mu is not None:
@@ -44,18 +40,36 @@ class Gaussian(object):
                 raise ValueError('sigma**2 should be greater than 0')
             pi = sigma ** -2
             tau = pi * mu
+        #: Precision, the inverse of the variance.
         self.pi = pi
+        #: Precision adjusted mean, the precision multiplied by the mean.
         self.tau = tau
 
+    def __getstate__(self):
+        # slots are not pickled by default.  keep the state same as the one
+        # pickled before the slots, with the attributes of subclasses.
+        state = dict(getattr(self, '__dict__', {}))
+        state['pi'], state['tau'] = self.pi, self.tau
+        return state
+
+    def __setstate__(self, state):
+        state = dict(state)
+        self.pi = state.pop('pi')
+        self.tau = state.pop('tau')
+        if state:
+            self.__dict__.update(state)
+
     @property
     def mu(self):
         """A property which returns the mean."""
-        return self.pi and self.tau / self.pi
+        pi = self.pi
+        return self.tau / pi if pi else pi
 
     @property
     def sigma(self):
         """A property which returns the the square root of the variance."""
-        return math.sqrt(1 / self.pi) if self.pi else inf
+        pi = self.pi
+        return math.sqrt(1 / pi) if pi else inf
 
     def __mul__(self, other):
         pi, tau = self.pi + other.pi, self.tau + other.tau
@@ -93,6 +107,8 @@ class Gaussian(object):
 class Matrix(list):
     """A model for matrix."""
 
+    __slots__ = ()
+
     def __init__(self, src, height=None, width=None):
         if callable(src):
             f, src = src, {}
@@ -117,11 +133,15 @@ class Matrix(list):
                 raise TypeError('A callable src must call set_height and '
                                 'set_width if the size is non-deterministic')
         if isinstance(src, list):
-            is_number = lambda x: isinstance(x, Number)
-            unique_col_sizes = set(map(len, src))
-            everything_are_number = filter(is_number, sum(src, []))
-            if len(unique_col_sizes) != 1 or not everything_are_number:
+            # scan the cells once without concatenating the rows.
+            if not src:
                 raise ValueError('src must be a rectangular array of numbers')
+            width = len(src[0])
+            for row in src:
+                if len(row) != width or \
+                   not all(isinstance(x, Number) for x in row):
+                    raise ValueError('src must be a rectangular array of '
+                                     'numbers')
             two_dimensional_array = src
         elif isinstance(src, dict):
             if not height or not width:
@@ -135,16 +155,26 @@ class Matrix(list):
                     height = h
                 if not width:
                     width = w
-            two_dimensional_array = []
-            for r in range(height):
-                row = []
-                two_dimensional_array.append(row)
-                for c in range(width):
-                    row.append(src.get((r, c), 0))
+            # scatter the given cells into zero-filled rows.  cells out of
+            # the size are ignored.
+            two_dimensional_array = [[0] * width for r in range(height)]
+            for (r, c), val in iteritems(src):
+                if 0 <= r < height and 0 <= c < width:
+                    two_dimensional_array[r][c] = val
         else:
             raise TypeError('src must be a list or dict or callable')
         super(Matrix, self).__init__(two_dimensional_array)
 
+    @classmethod
+    def _from_rows(cls, rows):
+        """Makes a matrix from rows which are already known to be a
+        rectangular array of numbers.  It skips the validation of
+        :meth:`__init__`.
+        """
+        matrix = cls.__new__(cls)
+        super(Matrix, matrix).__init__(rows)
+        return matrix
+
     @property
     def height(self):
         return len(self)
@@ -154,12 +184,7 @@ class Matrix(list):
         return len(self[0])
 
     def transpose(self):
-        height, width = self.height, self.width
-        src = {}
-        for c in range(width):
-            for r in range(height):
-                src[c, r] = self[r][c]
-        return type(self)(src, height=width, width=height)
+        return self._from_rows([list(col) for col in zip(*self)])
 
     def minor(self, row_n, col_n):
         height, width = self.height, self.width
@@ -167,23 +192,29 @@ class Matrix(list):
             raise ValueError('row_n should be between 0 and %d' % height)
         elif not (0 <= col_n < width):
             raise ValueError('col_n should be between 0 and %d' % width)
-        two_dimensional_array = []
-        for r in range(height):
-            if r == row_n:
-                continue
-            row = []
-            two_dimensional_array.append(row)
-            for c in range(width):
-                if c == col_n:
-                    continue
-                row.append(self[r][c])
-        return type(self)(two_dimensional_array)
+        # slice the column out of each row.  an empty minor of a 1x1 matrix
+        # is still rejected by the constructor.
+        return type(self)([row[:col_n] + row[col_n + 1:]
+                           for r, row in enumerate(self) if r != row_n])
 
     def determinant(self):
         height, width = self.height, self.width
         if height != width:
             raise ValueError('Only square matrix can calculate a determinant')
-        tmp, rv = copy.deepcopy(self), 1.
+        # the closed forms are multiplied by 1. to return a float like the
+        # elimination below.  this module divides without the true division.
+        if height == 1:
+            return 1. * self[0][0]
+        elif height == 2:
+            (a, b), (c, d) = self
+            return 1. * (a * d - b * c)
+        elif height == 3:
+            (a, b, c), (d, e, f), (g, h, i) = self
+            return 1. * (a * (e * i - f * h) - b * (d * i - f * g) +
+                         c * (d * h - e * g))
+        # the rows are swapped and rewritten, copy each of them.  the cells
+        # are numbers so there is nothing deeper to copy.
+        tmp, rv = [row[:] for row in self], 1.
         for c in range(width - 1, 0, -1):
             pivot, r = max((abs(tmp[r][c]), r) for r in range(c + 1))
             pivot = tmp[r][c]
@@ -193,11 +224,11 @@ class Matrix(list):
             if r != c:
                 rv = -rv
             rv *= pivot
-            fact = -1. / pivot
+            fact, pivot_row = -1. / pivot, tmp[c]
             for r in range(c):
-                f = fact * tmp[r][c]
-                for x in range(c):
-                    tmp[r][x] += f * tmp[c][x]
+                row = tmp[r]
+                f = fact * row[c]
+                row[:c] = [x + f * y for x, y in zip(row[:c], pivot_row)]
         return rv * tmp[0][0]
 
     def adjugate(self):
@@ -207,49 +238,109 @@ class Matrix(list):
         if height == 2:
             a, b = self[0][0], self[0][1]
             c, d = self[1][0], self[1][1]
-            return type(self)([[d, -b], [-c, a]])
-        src = {}
-        for r in range(height):
-            for c in range(width):
-                sign = -1 if (r + c) % 2 else 1
-                src[r, c] = self.minor(r, c).determinant() * sign
-        return type(self)(src, height, width)
+            return self._from_rows([[d, -b], [-c, a]])
+        elif height == 3:
+            # floated like the cofactors from the determinants of the minors.
+            (a, b, c), (d, e, f), (g, h, i) = self
+            return self._from_rows([[1. * x for x in row] for row in [
+                [e * i - f * h, c * h - b * i, b * f - c * e],
+                [f * g - d * i, a * i - c * g, c * d - a * f],
+                [d * h - e * g, b * g - a * h, a * e - b * d]]])
+        elif height > 3:
+            # adj(A) = det(A) * inv(A) takes a single elimination instead of
+            # a determinant for each cofactor.  but it is trustworthy only if
+            # no pivot vanished into the roundoff of a (nearly) singular
+            # matrix.
+            rows, det, least_pivot = self._eliminate()
+            scale = max(abs(x) for row in self for x in row)
+            if rows is not None and least_pivot > scale * 1e-8:
+                return self._from_rows([[det * x for x in row]
+                                        for row in rows])
+        # the adjugate is the transpose of the cofactor matrix.
+        return self._from_rows([[self.minor(r, c).determinant() *
+                                 (-1 if (r + c) % 2 else 1)
+                                 for r in range(height)]
+                                for c in range(width)])
+
+    def _eliminate(self):
+        """Runs Gauss-Jordan elimination with partial pivoting on the matrix
+        augmented by the identity.  It takes O(n^3) while the cofactors take
+        a determinant for each cell.
+
+        Returns the rows of the inverse, the determinant and the smallest
+        absolute pivot.  The rows are ``None`` if a pivot is zero.
+        """
+        # the cells are floated because this module divides without the true
+        # division of Python 3.
+        size = self.height
+        rows = [[float(x) for x in row] +
+                [1. if x == r else 0. for x in range(size)]
+                for r, row in enumerate(self)]
+        det, least_pivot = 1., inf
+        for c in range(size):
+            pivot, r = max((abs(rows[r][c]), r) for r in range(c, size))
+            if not pivot:
+                return None, 0., 0.
+            least_pivot = min(least_pivot, pivot)
+            if r != c:
+                rows[r], rows[c] = rows[c], rows[r]
+                det = -det
+            pivot = rows[c][c]
+            det *= pivot
+            pivot_row = rows[c] = [x / pivot for x in rows[c]]
+            for r in range(size):
+                f = rows[r][c]
+                if r == c or not f:
+                    continue
+                rows[r] = [x - f * y for x, y in zip(rows[r], pivot_row)]
+        return [row[size:] for row in rows], det, least_pivot
 
     def inverse(self):
-        if self.height == self.width == 1:
-            return type(self)([[1. / self[0][0]]])
-        return (1. / self.determinant()) * self.adjugate()
+        height, width = self.height, self.width
+        if height != width:
+            raise ValueError('Only square matrix can be inverted')
+        if height == 1:
+            return self._from_rows([[1. / self[0][0]]])
+        elif height == 2:
+            (a, b), (c, d) = self
+            det_inv = 1. / (a * d - b * c)
+            return self._from_rows([[d * det_inv, -b * det_inv],
+                                    [-c * det_inv, a * det_inv]])
+        elif height == 3:
+            (a, b, c), (d, e, f), (g, h, i) = self
+            A, B, C = e * i - f * h, f * g - d * i, d * h - e * g
+            det_inv = 1. / (a * A + b * B + c * C)
+            return self._from_rows([
+                [A * det_inv, (c * h - b * i) * det_inv,
+                 (b * f - c * e) * det_inv],
+                [B * det_inv, (a * i - c * g) * det_inv,
+                 (c * d - a * f) * det_inv],
+                [C * det_inv, (b * g - a * h) * det_inv,
+                 (a * e - b * d) * det_inv]])
+        rows = self._eliminate()[0]
+        if rows is None:
+            raise ZeroDivisionError('Singular matrix cannot be inverted')
+        return self._from_rows(rows)
 
     def __add__(self, other):
-        height, width = self.height, self.width
-        if (height, width) != (other.height, other.width):
+        if (self.height, self.width) != (other.height, other.width):
             raise ValueError('Must be same size')
-        src = {}
-        for r in range(height):
-            for c in range(width):
-                src[r, c] = self[r][c] + other[r][c]
-        return type(self)(src, height, width)
+        return self._from_rows([[a + b for a, b in zip(row, other_row)]
+                                for row, other_row in zip(self, other)])
 
     def __mul__(self, other):
         if self.width != other.height:
             raise ValueError('Bad size')
-        height, width = self.height, other.width
-        src = {}
-        for r in range(height):
-            for c in range(width):
-                src[r, c] = sum(self[r][x] * other[x][c]
-                                for x in range(self.width))
-        return type(self)(src, height, width)
+        # walk the columns of the other matrix as rows.
+        cols = list(zip(*other))
+        return self._from_rows([[sum(a * b for a, b in zip(row, col))
+                                 for col in cols] for row in self])
 
     def __rmul__(self, other):
         if not isinstance(other, Number):
             raise TypeError('The operand should be a number')
-        height, width = self.height, self.width
-        src = {}
-        for r in range(height):
-            for c in range(width):
-                src[r, c] = other * self[r][c]
-        return type(self)(src, height, width)
+        return self._from_rows([[other * cell for cell in row]
+                                for row in self])
 
     def __repr__(self):
         return '{}({})'.format(type(self).__name__, super(Matrix, self).__repr__())
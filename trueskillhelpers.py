@@ -1,15 +1,16 @@
 # -*- coding: utf-8 -*-
-from __future__ import with_statement
 from contextlib import contextmanager
 import functools
-import inspect
 import logging
+import math
+import sys
+import weakref
 
 import trueskill
 from trueskill.backends import available_backends
 from trueskill.factorgraph import (Variable, Factor, PriorFactor,
                                    LikelihoodFactor, SumFactor)
-from trueskill.mathematics import Gaussian
+from trueskill.mathematics import Gaussian, inf
 
 
 __all__ = ['substituted_trueskill', 'calc_dynamic_draw_probability',
@@ -25,15 +26,13 @@ def substituted_trueskill(*args, **kwargs):
            assert Rating().mu == 0
     """
     env = trueskill.global_env()
-    params = [['mu', env.mu], ['sigma', env.sigma], ['beta', env.beta],
-              ['tau', env.tau], ['draw_probability', env.draw_probability],
-              ['backend', env.backend]]
+    params = {'mu': env.mu, 'sigma': env.sigma, 'beta': env.beta,
+              'tau': env.tau, 'draw_probability': env.draw_probability,
+              'backend': env.backend}
     # merge settings with previous TrueSkill object
-    for x, arg in enumerate(args):
-        params[x][1] = arg
-    params = dict(params)
-    for kw, arg in kwargs.items():
-        params[kw] = arg
+    params.update(zip(('mu', 'sigma', 'beta', 'tau', 'draw_probability',
+                       'backend'), args))
+    params.update(kwargs)
     try:
         # setup the environment
         yield trueskill.setup(**params)
@@ -43,9 +42,8 @@ def substituted_trueskill(*args, **kwargs):
 
 
 def calc_dynamic_draw_probability(rating_group1, rating_group2, env=None):
-    from trueskill.factorgraph import (Variable, )
     if env is None:
-        env = global_env()
+        env = trueskill.global_env()
     team_perf_vars = []
     for rating_group in [rating_group1, rating_group2]:
         team_perf_var = Variable()
@@ -61,6 +59,10 @@ def calc_dynamic_draw_probability(rating_group1, rating_group2, env=None):
                                 trueskill.Rating(team_perf_vars[1]), env)
 
 
+def _no_color(text, *args, **kwargs):
+    return text
+
+
 @contextmanager
 def factor_graph_logging(color=False):
     """In the context, a factor graph prints logs as DEBUG level. It will help
@@ -71,7 +73,6 @@ def factor_graph_logging(color=False):
            logger.addHandler(StreamHandler(sys.stderr))
            rate_1vs1(Rating(), Rating())
     """
-    import inspect
     # color mode uses the termcolor module
     if color:
         try:
@@ -79,15 +80,23 @@ def factor_graph_logging(color=False):
         except ImportError:
             raise ImportError('To enable color mode, install termcolor')
     else:
-        colored = lambda s, *a, **k: s
+        colored = _no_color
     logger = logging.getLogger('TrueSkill')
     orig_factor_init = Factor.__init__
     orig_variable_set = Variable.set
+    # factors have no instance dictionary, keep their layer names here.  the
+    # names should not keep the factor graphs alive.
+    layer_names = weakref.WeakKeyDictionary()
+    # layer names by the names of layer builders and their colored headers
+    layer_titles, layer_headers = {}, {}
+    bullet_on, bullet_off = colored(' * ', 'red'), '   '
     def repr_factor(factor):
         return '{}@{}'.format(type(factor).__name__, id(factor))
     def repr_gauss(gauss):
-        return 'N(mu=%.3f, sigma=%.3f, pi=%r, tau=%r)' % \
-               (gauss.mu, gauss.sigma, gauss.pi, gauss.tau)
+        # derive mu and sigma from a single read of pi and tau.
+        pi, tau = gauss.pi, gauss.tau
+        mu, sigma = (tau / pi, math.sqrt(1 / pi)) if pi else (0, inf)
+        return 'N(mu=%.3f, sigma=%.3f, pi=%r, tau=%r)' % (mu, sigma, pi, tau)
     def r(val):
         if isinstance(val, Factor):
             return repr_factor(val)
@@ -95,58 +104,76 @@ def factor_graph_logging(color=False):
             return repr_gauss(val)
         else:
             return repr(val)
+    def repr_message(fac, msg, old_msg, changed):
+        old_pi, old_tau = old_msg
+        if (old_pi, old_tau) == (msg.pi, msg.tau):
+            line = '{}: {}'.format(r(fac), r(msg))
+        else:
+            old_msg = Gaussian(pi=old_pi, tau=old_tau)
+            line = '{}: {} -> {}'.format(r(fac), r(old_msg), r(msg))
+        return (bullet_on if changed else bullet_off) + line
     def factor_init(self, *args, **kwargs):
-        frames = inspect.getouterframes(inspect.currentframe())
-        layer_builder_name = frames[2][3]
-        assert (layer_builder_name.startswith('build_') and
-                layer_builder_name.endswith('_layer'))
-        self._layer_name = layer_builder_name[6:].replace('_', ' ').title()
+        if logger.isEnabledFor(logging.DEBUG):
+            # the layer builder is the caller of the factor's constructor.
+            layer_builder_name = sys._getframe(2).f_code.co_name
+            try:
+                layer_name = layer_titles[layer_builder_name]
+            except KeyError:
+                assert (layer_builder_name.startswith('build_') and
+                        layer_builder_name.endswith('_layer'))
+                layer_name = layer_builder_name[6:].replace('_', ' ').title()
+                layer_titles[layer_builder_name] = layer_name
+                layer_headers[layer_name] = \
+                    colored('[{}]'.format(layer_name), 'blue')
+            layer_names[self] = layer_name
         return orig_factor_init(self, *args, **kwargs)
     def variable_set(self, val):
-        old_value = Gaussian(pi=self.pi, tau=self.tau)
-        old_messages = {fac: Gaussian(pi=msg.pi, tau=msg.tau)
+        if not logger.isEnabledFor(logging.DEBUG):
+            return orig_variable_set(self, val)
+        # snapshot (pi, tau) pairs.  Gaussians are made only for changes.
+        old_value = (self.pi, self.tau)
+        old_messages = {fac: (msg.pi, msg.tau)
                         for fac, msg in self.messages.items()}
         delta = orig_variable_set(self, val)
-        # inspect outer frames
-        frames = inspect.getouterframes(inspect.currentframe())
+        # walk outer frames up to the factor method
+        frame = sys._getframe(1)
         methods = [None, None]
-        for frame in frames:
-            method = frame[3]
+        while frame is not None:
+            method = frame.f_code.co_name
             if method.startswith('update_'):
                 methods[0] = method
             elif method in ('up', 'down'):
                 methods[1] = method
                 break
-        factor = frame[0].f_locals['self']
-        before = Gaussian(pi=self.pi, tau=self.tau)
+            frame = frame.f_back
+        factor = frame.f_locals['self']
         # helpers for logging
         logs = []
         l = logs.append
-        bullet = lambda changed: colored(' * ', 'red') if changed else '   '
         # print layer
-        if getattr(logger, '_prev_layer_name', None) != factor._layer_name:
-            logger._prev_layer_name = factor._layer_name
-            l(colored('[{}]'.format(factor._layer_name), 'blue'))
+        # the layer is unknown if the factor was made while DEBUG was off.
+        layer_name = layer_names.get(factor)
+        if layer_name is not None and \
+           getattr(logger, '_prev_layer_name', None) != layer_name:
+            logger._prev_layer_name = layer_name
+            l(layer_headers[layer_name])
         # print factor
         l(colored('<{}.{}>'.format(r(factor), methods[1]), 'cyan'))
         # print value
-        if old_value == self:
+        if old_value == (self.pi, self.tau):
             line = '{}'.format(r(self))
         else:
-            line = '{} -> {}'.format(r(old_value), r(self))
-        l(bullet(methods[0] == 'update_value') + line)
+            old_pi, old_tau = old_value
+            line = '{} -> {}'.format(r(Gaussian(pi=old_pi, tau=old_tau)),
+                                     r(self))
+        l((bullet_on if methods[0] == 'update_value' else bullet_off) + line)
         # print messages
-        fmt = '{}: {} -> {}'.format
-        for fac, msg in self.messages.items():
-            old_msg = old_messages[fac]
-            changed = fac is factor and methods[0] == 'update_message'
-            if old_msg == msg:
-                line = '{}: {}'.format(r(fac), r(msg))
-            else:
-                line = '{}: {} -> {}'.format(r(fac), r(old_msg), r(msg))
-            l(bullet(changed) + line)
-        # print buffered logs
-        map(logger.debug, logs)
+        updated = factor if methods[0] == 'update_message' else None
+        logs.extend([repr_message(fac, msg, old_messages[fac], fac is updated)
+                     for fac, msg in self.messages.items()])
+        # print buffered logs at once.  map() is lazy on Python 3 and used to
+        # print nothing.
+        logger.debug('\n'.join(logs))
         return delta
     try:
         Factor.__init__, Variable.set = factor_init, variable_set
@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
-from __future__ import with_statement
-
+import copy
+from itertools import chain
+import pickle
 import warnings
 
 from almost import Approximate
@@ -10,6 +11,7 @@ from conftest import various_backends
 import trueskill as t
 from trueskill import (
     quality, quality_1vs1, rate, rate_1vs1, Rating, setup, TrueSkill)
+from trueskill.mathematics import Gaussian, Matrix
 
 
 warnings.simplefilter('always')
@@ -24,13 +26,11 @@ class almost(Approximate):
     def normalize(self, value):
         if isinstance(value, Rating):
             return self.normalize(tuple(value))
-        elif isinstance(value, list):
-            try:
-                if isinstance(value[0][0], Rating):
-                    # flatten transformed ratings
-                    return list(sum(value, ()))
-            except (TypeError, IndexError):
-                pass
+        elif (isinstance(value, list) and value and
+              isinstance(value[0], (tuple, list)) and value[0] and
+              isinstance(value[0][0], Rating)):
+            # flatten transformed ratings
+            return list(chain.from_iterable(value))
         return super(almost, self).normalize(value)
 
     @classmethod
@@ -79,6 +79,42 @@ def test_rating_to_number():
         pass
 
 
+class NamedRating(Rating):
+
+    def __init__(self, name, *args, **kwargs):
+        super(NamedRating, self).__init__(*args, **kwargs)
+        self.name = name
+
+
+def test_pickle_rating():
+    r = Rating(30, 3)
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+        loaded = pickle.loads(pickle.dumps(r, protocol))
+        assert type(loaded) is Rating
+        assert (loaded.pi, loaded.tau) == (r.pi, r.tau)
+        assert (loaded.mu, loaded.sigma) == (r.mu, r.sigma)
+    # pickled by 0.4.5, before Gaussian used slots
+    legacy = (b'ccopy_reg\n_reconstructor\np0\n(ctrueskill\nRating\np1\n'
+              b'c__builtin__\nobject\np2\nNtp3\nRp4\n(dp5\nVpi\np6\n'
+              b'F0.1111111111111111\nsVtau\np7\nF3.333333333333333\nsb.')
+    loaded = pickle.loads(legacy)
+    assert (loaded.pi, loaded.tau) == (r.pi, r.tau)
+    assert almost(loaded) == (30, 3)
+    loaded = Rating.__new__(Rating)
+    loaded.__setstate__({'pi': r.pi, 'tau': r.tau})
+    assert loaded == r
+    assert almost(loaded) == (30, 3)
+    # attributes of a subclass survive
+    r = NamedRating('alice', 30, 3)
+    for copied in [pickle.loads(pickle.dumps(r, protocol))
+                   for protocol in range(pickle.HIGHEST_PROTOCOL + 1)] + \
+            [copy.copy(r), copy.deepcopy(r)]:
+        assert type(copied) is NamedRating
+        assert copied.name == 'alice'
+        assert copied == r
+        assert almost(copied) == (30, 3)
+
+
 def test_unsorted_groups():
     t1, t2, t3 = generate_teams([1, 1, 1])
     rated = rate([t1, t2, t3], [2, 1, 0])
@@ -148,6 +184,18 @@ def test_deprecated_individual_rating_groups():
     deprecated_call(t.match_quality, [r1, r2, r3])
 
 
+def test_deprecated_mixed_rating_groups():
+    r1, r2, r3 = Rating(50, 1), Rating(10, 5), Rating(15, 5)
+    expected = rate([(r1,), (r2,), (r3,)])
+    for groups in ([(r1,), r2, r3], [r1, (r2,), (r3,)],
+                   iter([r1, r2, (r3,)])):
+        with deprecated_call():
+            assert t.transform_ratings(groups) == expected
+    with deprecated_call():
+        assert t.match_quality([r1, (r2,), r3]) == \
+            quality([(r1,), (r2,), (r3,)])
+
+
 def test_rating_tuples():
     r1, r2, r3 = Rating(), Rating(), Rating()
     rated = rate([(r1, r2), (r3,)])
@@ -210,14 +258,8 @@ def test_backend():
 
 
 def generate_teams(sizes, env=None):
-    rating_cls = Rating if env is None else env.create_rating
-    rating_groups = []
-    for size in sizes:
-        ratings = []
-        for x in range(size):
-            ratings.append(rating_cls())
-        rating_groups.append(tuple(ratings))
-    return rating_groups
+    rating = Rating() if env is None else env.create_rating()
+    return [(rating,) * size for size in sizes]
 
 
 def generate_individual(size, env=None):
@@ -394,8 +436,7 @@ def test_microsoft_research_example():
     _rated = rate([{'alice': alice}, {'bob': bob}, {'chris': chris},
                    {'darren': darren}, {'eve': eve}, {'fabien': fabien},
                    {'george': george}, {'hillary': hillary}])
-    rated = {}
-    list(map(rated.update, _rated))
+    rated = {name: rating for team in _rated for name, rating in team.items()}
     assert almost(rated['alice']) == (36.771, 5.749)
     assert almost(rated['bob']) == (32.242, 5.133)
     assert almost(rated['chris']) == (29.074, 4.943)
@@ -406,11 +447,10 @@ def test_microsoft_research_example():
     assert almost(rated['hillary']) == (13.229, 5.749)
 
 
-@various_backends
 def test_dynamic_draw_probability():
     from trueskillhelpers import calc_dynamic_draw_probability as calc
+    dyn = TrueSkill(draw_probability=t.dynamic_draw_probability)
     def assert_predictable_draw_probability(r1, r2, drawn=False):
-        dyn = TrueSkill(draw_probability=t.dynamic_draw_probability)
         sta = TrueSkill(draw_probability=calc((r1,), (r2,), dyn))
         assert dyn.rate_1vs1(r1, r2, drawn) == sta.rate_1vs1(r1, r2, drawn)
     assert_predictable_draw_probability(Rating(100), Rating(10))
@@ -424,10 +464,43 @@ def test_dynamic_draw_probability():
     assert_predictable_draw_probability(Rating(25, 10), Rating(25, 0.1))
 
 
+def test_factor_graph_logging():
+    import gc
+    import logging
+    from trueskill.factorgraph import Factor
+    from trueskillhelpers import factor_graph_logging
+    logs = []
+    class Handler(logging.Handler):
+        def emit(self, record):
+            logs.append(record.getMessage())
+    handler = Handler()
+    with factor_graph_logging() as logger:
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+        try:
+            rate_1vs1(Rating(), Rating())
+            # the logging context should not keep the factor graph alive.
+            gc.collect()
+            assert not [o for o in gc.get_objects() if isinstance(o, Factor)]
+        finally:
+            logger.removeHandler(handler)
+            logger.setLevel(logging.NOTSET)
+    assert logs
+    assert '<PriorFactor@' in logs[0]
+
+
+def test_changing_draw_probability():
+    env = TrueSkill(draw_probability=0.10)
+    rate_1vs1(Rating(), Rating(), drawn=True, env=env)
+    env.draw_probability = 0.50
+    expected = rate_1vs1(Rating(), Rating(), drawn=True,
+                         env=TrueSkill(draw_probability=0.50))
+    assert rate_1vs1(Rating(), Rating(), drawn=True, env=env) == expected
+
+
 # functions
 
 
-@various_backends
 def test_exposure():
     env = TrueSkill()
     assert env.expose(env.create_rating()) == 0
@@ -438,22 +511,54 @@ def test_exposure():
 # mathematics
 
 
+@various_backends(['scipy'])
+def test_scipy_backend_with_arrays():
+    import numpy
+    from trueskill.backends import choose_backend
+    cdf, pdf, ppf = choose_backend('scipy')
+    xs = numpy.array([-3., -0.5, 0., 1.5])
+    assert almost(list(cdf(xs))) == [cdf(x) for x in xs]
+    assert almost(list(pdf(xs))) == [pdf(x) for x in xs]
+    ps = numpy.array([0.1, 0.5, 0.75])
+    assert almost(list(ppf(ps))) == [ppf(p) for p in ps]
+
+
+def test_pdf_with_sigma():
+    from trueskill.backends import available_backends, choose_backend
+    for backend in available_backends():
+        cdf, pdf, ppf = choose_backend(backend)
+        assert almost(pdf(0, 0, 0.5)) == 0.797885
+        assert almost(pdf(1, 0, 2)) == 0.176033
+        assert almost(pdf(25, 20, 5)) == 0.048394
+        if backend != 'mpmath':  # mpmath.npdf keeps the sign of sigma
+            assert almost(pdf(1, 0, -2)) == 0.176033
+
+
 def test_valid_gaussian():
-    from trueskill.mathematics import Gaussian
     with raises(TypeError):  # sigma argument is needed
         Gaussian(0)
     with raises(ValueError):  # sigma**2 should be greater than 0
         Gaussian(0, 0)
 
 
+def test_gaussian_follows_pi_and_tau():
+    g = Gaussian(1, 2)
+    assert (g.mu, g.sigma) == (1, 2)
+    g.pi, g.tau = 1., 5.
+    assert (g.mu, g.sigma) == (5, 1)
+    g.pi = 0
+    assert (g.mu, g.sigma) == (0, inf)
+
+
 def test_valid_matrix():
-    from trueskill.mathematics import Matrix
     with raises(TypeError):  # src must be a list or dict or callable
         Matrix(None)
     with raises(ValueError):  # src must be a rectangular array of numbers
         Matrix([])
     with raises(ValueError):  # src must be a rectangular array of numbers
         Matrix([[1, 2, 3], [4, 5]])
+    with raises(ValueError):  # src must be a rectangular array of numbers
+        Matrix([[1, 2], [3, '4']])
     with raises(TypeError):
         # A callable src must return an interable which generates a tuple
         # containing coordinate and value
@@ -461,7 +566,6 @@ def test_valid_matrix():
 
 
 def test_matrix_from_dict():
-    from trueskill.mathematics import Matrix
     mat = Matrix({(0, 0): 1, (4, 9): 1})
     assert mat.height == 5
     assert mat.width == 10
@@ -472,7 +576,6 @@ def test_matrix_from_dict():
 
 
 def test_matrix_from_item_generator():
-    from trueskill.mathematics import Matrix
     def gen_matrix(height, width):
         yield (0, 0), 1
         yield (height - 1, width - 1), 1
@@ -501,11 +604,46 @@ def test_matrix_from_item_generator():
 
 
 def test_matrix_operations():
-    from trueskill.mathematics import Matrix
     assert Matrix([[1, 2], [3, 4]]).inverse() == \
         Matrix([[-2.0, 1.0], [1.5, -0.5]])
     assert Matrix([[1, 2], [3, 4]]).determinant() == -2
+    assert Matrix([[3]]).determinant() == 3
+    for src in ([[3]], [[1, 2], [3, 4]], [[2, 1, 1], [1, 3, 2], [1, 0, 0]],
+                [[4, 3, 2, 1], [0, 1, 2, 3], [1, 0, 1, 0], [2, 2, 0, 1]]):
+        assert isinstance(Matrix(src).determinant(), float)
+        if len(src) > 2:
+            assert all(isinstance(x, float)
+                       for row in Matrix(src).adjugate() for x in row)
+    assert Matrix([[2, 1, 1], [1, 3, 2], [1, 0, 0]]).determinant() == -1
+    assert almost(Matrix([[4, 3, 2, 1], [0, 1, 2, 3], [1, 0, 1, 0],
+                          [2, 2, 0, 1]]).determinant()) == 8
     assert Matrix([[1, 2], [3, 4]]).adjugate() == Matrix([[4, -2], [-3, 1]])
+    assert almost(Matrix([[2, 1, 1], [1, 3, 2], [1, 0, 0]]).adjugate()) == \
+        [[0, 0, -1], [2, -1, -3], [-3, 1, 5]]
+    assert Matrix([[1, 2, 3], [2, 4, 6], [1, 0, 1]]).adjugate() == \
+        Matrix([[4, -2, 0], [4, -2, 0], [-4, 2, 0]])
+    # singular only by roundoff; the determinant is not exactly zero
+    mat = Matrix([[.1, .2, .3, .4], [.5, .6, .7, .8], [.9, 1, 1.1, 1.2],
+                  [1, 3, 2, 5]])
+    assert almost(mat.adjugate(), 6) == \
+        [[-.16, .32, -.16, 0], [.2, -.4, .2, 0], [.08, -.16, .08, 0],
+         [-.12, .24, -.12, 0]]
+    mat = Matrix([[1, 2, 3, 4], [2, 1, 0, 1], [3, 3, 3, 5 + 1e-12],
+                  [0, 1, 1, 2]])
+    assert almost(mat.adjugate(), 6) == \
+        [[1, 1, -1, 0], [-5, -5, 5, 0], [-1, -1, 1, 0], [3, 3, -3, 0]]
+    for src in ([[2, 1, 1], [1, 3, 2], [1, 0, 0]],
+                [[4, 3, 2, 1], [0, 1, 2, 3], [1, 0, 1, 0], [2, 2, 0, 1]],
+                [[0, 2, 0, 1, 3], [1, 0, 4, 0, 2], [2, 1, 0, 3, 0],
+                 [0, 3, 1, 0, 1], [1, 0, 2, 1, 0]]):
+        mat = Matrix(src)
+        expected = (1. / mat.determinant()) * mat.adjugate()
+        assert almost(mat.inverse(), 6) == expected
+        identity = [[float(r == c) for c in range(len(src))]
+                    for r in range(len(src))]
+        assert almost(mat * mat.inverse(), 6) == identity
+    with raises(ValueError):  # Only square matrix can be inverted
+        Matrix([[1, 2, 3], [4, 5, 6]]).inverse()
     with raises(ValueError):  # Bad size
         assert Matrix([[1, 2], [3, 4]]) * Matrix([[5, 6]])
     assert Matrix([[1, 2], [3, 4]]) * Matrix([[5, 6, 7], [8, 9, 10]]) == \
@@ -530,17 +668,11 @@ def test_issue3():
     """
     # @konikos's case 1
     t1 = (Rating(42.234, 3.728), Rating(43.290, 3.842))
-    t2 = (Rating(16.667, 0.500), Rating(16.667, 0.500), Rating(16.667, 0.500),
-          Rating(16.667, 0.500), Rating(16.667, 0.500), Rating(16.667, 0.500),
-          Rating(16.667, 0.500), Rating(16.667, 0.500), Rating(16.667, 0.500),
-          Rating(16.667, 0.500), Rating(16.667, 0.500), Rating(16.667, 0.500),
-          Rating(16.667, 0.500), Rating(16.667, 0.500), Rating(16.667, 0.500))
+    t2 = (Rating(16.667, 0.500),) * 15
     rate([t1, t2], [6, 5])
     # @konikos's case 2
-    t1 = (Rating(25.000, 0.500), Rating(25.000, 0.500), Rating(25.000, 0.500),
-          Rating(25.000, 0.500), Rating(33.333, 0.500), Rating(33.333, 0.500),
-          Rating(33.333, 0.500), Rating(33.333, 0.500), Rating(41.667, 0.500),
-          Rating(41.667, 0.500), Rating(41.667, 0.500), Rating(41.667, 0.500))
+    t1 = ((Rating(25.000, 0.500),) * 4 + (Rating(33.333, 0.500),) * 4 +
+          (Rating(41.667, 0.500),) * 4)
     t2 = (Rating(42.234, 3.728), Rating(43.291, 3.842))
     rate([t1, t2], [0, 28])
 
@@ -559,11 +691,8 @@ def test_issue4():
     r1, r2 = Rating(105.247, 0.439), Rating(27.030, 0.901)
     # make numpy to raise FloatingPointError instead of warning
     # RuntimeWarning
-    old_settings = numpy.seterr(divide='raise')
-    try:
+    with numpy.errstate(divide='raise'):
         rate([(r1,), (r2,)])
-    finally:
-        numpy.seterr(**old_settings)
 
 
 @various_backends([None, 'scipy'])